@@ -5,39 +5,239 @@ Although the application provides its own custom management interface for
 creating and managing forms, the models are registered with the Django admin
 for convenience.  Access the Django admin at ``/djadmin/``.  The admin
 interface may be useful for debugging or ad‑hoc data inspection.
+
+The response and answer tables can grow to millions of rows, so their
+change lists avoid anything whose cost grows with the table: related
+objects are joined instead of fetched per row, filters take an id instead
+of listing every form or question, the response date hierarchy is built
+from the earliest and latest indexed date, and unfiltered pages show the
+total from the database statistics, marked as an estimate, instead of
+running ``COUNT(*)``.
 """
 from __future__ import annotations
 
 from django.contrib import admin
-from .models import Answer, Choice, Form, Question, Response
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+from .models import Answer, Choice, Form, Question, Response, SubmissionRollup
+
+
+class IdListFilter(admin.ListFilter):
+    """
+    Filter a change list by the id of a related object typed into a box.
+
+    Unlike the default related-field filter it does not load and render
+    every possible related object.  Subclasses set ``title``,
+    ``parameter_name`` and ``field_path`` (the foreign key to filter on).
+    """
+
+    template = 'admin/formsapp/id_filter.html'
+    parameter_name: str
+    field_path: str
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        if self.parameter_name in params:
+            self.used_parameters[self.parameter_name] = params.pop(self.parameter_name)
+        self.model = model
+
+    def has_output(self) -> bool:
+        return True
+
+    def value(self) -> str | None:
+        return self.used_parameters.get(self.parameter_name)
+
+    def expected_parameters(self) -> list[str]:
+        return [self.parameter_name]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f'{self.parameter_name} must be an id')
+        return queryset.filter(**{f'{self.field_path}_id': int(value)})
+
+    def selected_label(self) -> str:
+        """Describe the selected related object, if it exists."""
+        value = self.value()
+        if not value or not value.isdigit():
+            return ''
+        related = self.model._meta.get_field(self.field_path).related_model
+        obj = related._default_manager.filter(pk=int(value)).first()
+        return str(obj) if obj is not None else ''
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'hidden_params': [
+                (key, value) for key, value in changelist.params.items()
+                if key not in (self.parameter_name, PAGE_VAR)
+            ],
+            'label': self.selected_label(),
+        }
+
+
+class FormIdFilter(IdListFilter):
+    title = 'form id'
+    parameter_name = 'form_id'
+    field_path = 'form'
+
+
+class QuestionIdFilter(IdListFilter):
+    title = 'question id'
+    parameter_name = 'question_id'
+    field_path = 'question'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that estimates the size of large unfiltered tables.
+
+    ``COUNT(*)`` has to visit every row.  When the change list is not
+    filtered the row count is instead taken from the database's own
+    statistics, and only if there are none or they are below
+    ``exact_count_threshold`` is an exact count run.  The estimate can be
+    off in either direction, so a page that turns out to be past the end
+    triggers an exact count and is replaced by the last page.
+    """
+
+    exact_count_threshold = 10_000
+    count_is_estimate = False
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                self.count_is_estimate = True
+                return estimate
+        return super().count
+
+    def page(self, number):
+        try:
+            page = super().page(number)
+        except EmptyPage:
+            if not self.count_is_estimate:
+                raise
+            page = None
+        if self.count_is_estimate and (page is None or (int(number) > 1 and not page.object_list)):
+            self.count_is_estimate = False
+            self.__dict__['count'] = Paginator.count.func(self)
+            self.__dict__.pop('num_pages', None)
+            page = super().page(min(int(number), self.num_pages))
+        return page
+
+
+def estimate_row_count(model) -> int | None:
+    """
+    Return the row count of ``model`` from the database statistics, if any.
+
+    PostgreSQL keeps ``reltuples`` up to date through autovacuum.  SQLite
+    only has statistics in ``sqlite_stat1`` after ``ANALYZE`` (or ``PRAGMA
+    optimize``) has been run.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            value = row[0] if row is not None else None
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # The first number of each index's stat is the table's row count.
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+            row = cursor.fetchone()
+            value = int(row[0].split()[0]) if row is not None and row[0] else None
+        else:
+            return None
+    if value is None or value < 0:
+        return None
+    return int(value)
+
+
+class EstimatedCountChangeList(ChangeList):
+    """Change list that follows the paginator when it corrects an estimate."""
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_count = self.paginator.count
+        self.page_num = min(self.page_num, self.paginator.num_pages)
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.result_count > self.list_per_page
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Admin options for tables too large to count on every page view."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
 
 
 @admin.register(Form)
 class FormAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'created_at', 'published')
     prepopulated_fields = {'slug': ('title',)}
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('text', 'form', 'question_type', 'order')
-    list_filter = ('form',)
+    list_filter = (FormIdFilter,)
+    list_select_related = ('form',)
     ordering = ('form', 'order')
+    search_fields = ('text',)
+    autocomplete_fields = ('form',)
 
 
 @admin.register(Choice)
 class ChoiceAdmin(admin.ModelAdmin):
     list_display = ('text', 'question')
-    list_filter = ('question',)
+    list_filter = (QuestionIdFilter,)
+    list_select_related = ('question',)
+    search_fields = ('text',)
+    autocomplete_fields = ('question',)
 
 
 @admin.register(Response)
-class ResponseAdmin(admin.ModelAdmin):
-    list_display = ('form', 'submitted_at')
-    list_filter = ('form',)
+class ResponseAdmin(LargeTableAdmin):
+    list_display = ('id', 'form', 'submitted_at')
+    list_filter = (FormIdFilter,)
+    # Response.__str__ and the form column both need the form title.
+    list_select_related = ('form',)
+    # The date hierarchy is rendered by ``indexed_date_hierarchy`` (see
+    # templates/admin/formsapp/response/change_list.html).  Ordering by the
+    # indexed date lets date and form filters read a page off the index.
+    date_hierarchy = 'submitted_at'
+    ordering = ('-submitted_at', '-id')
+    autocomplete_fields = ('form',)
 
 
 @admin.register(Answer)
-class AnswerAdmin(admin.ModelAdmin):
+class AnswerAdmin(LargeTableAdmin):
     list_display = ('response', 'question', 'text', 'choice')
-    list_filter = ('question',)
\ No newline at end of file
+    list_filter = (QuestionIdFilter,)
+    # The response column renders Response.__str__, which uses the form title.
+    list_select_related = ('response__form', 'question', 'choice')
+    raw_id_fields = ('response',)
+    autocomplete_fields = ('question', 'choice')
+
+
+@admin.register(SubmissionRollup)
+class SubmissionRollupAdmin(admin.ModelAdmin):
+    list_display = ('form', 'period', 'bucket_start', 'count')
+    list_filter = (FormIdFilter, 'period')
+    list_select_related = ('form',)
+    raw_id_fields = ('form',)
@@ -0,0 +1,179 @@
+"""
+Admission control for the public submission path.
+
+Two independent checks run before a submitted form touches the database:
+
+* A token-bucket rate limiter keyed by client IP address and form slug.
+  Each key may submit ``FORMS_RATE_LIMIT_BURST`` times in quick succession
+  and then ``FORMS_RATE_LIMIT_RATE`` times per second.  Clients over the
+  limit receive a ``429 Too Many Requests`` page.  The defaults are generous
+  enough for a whole class submitting from behind one NAT or proxy address.
+* A global cap of ``FORMS_MAX_CONCURRENT_WRITES`` submissions being saved at
+  once.  A submission that cannot get a slot within
+  ``FORMS_WRITE_SLOT_TIMEOUT`` seconds receives a ``503 Service Unavailable``
+  page instead of queueing behind SQLite's single writer until it hits a
+  lock timeout.
+
+Setting ``FORMS_RATE_LIMIT_RATE`` or ``FORMS_MAX_CONCURRENT_WRITES`` to
+``None`` disables the corresponding check.  All state lives in the worker
+process, so limits apply per process.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Hashable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import render
+
+from . import metrics
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe token buckets for an unbounded set of keys.
+
+    At most ``max_keys`` buckets are remembered; the least recently used
+    bucket is dropped when the limit is exceeded, which at worst lets an
+    idle client start again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10_000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: Hashable) -> tuple[bool, int]:
+        """
+        Take one token from the bucket for ``key``.
+
+        Returns ``(allowed, retry_after)`` where ``retry_after`` is the number
+        of seconds until a token will be available if the request was refused.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, max(1, math.ceil((1 - tokens) / self.rate))
+
+
+class WriteSlots:
+    """A counting semaphore that also reports how many slots are in use."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.in_use = 0
+
+    def acquire(self, timeout: float) -> bool:
+        if not self._semaphore.acquire(timeout=timeout):
+            return False
+        with self._lock:
+            self.in_use += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+        self._semaphore.release()
+
+
+def _build_limiter() -> TokenBucketLimiter | None:
+    rate = getattr(settings, 'FORMS_RATE_LIMIT_RATE', None)
+    if rate is None:
+        return None
+    return TokenBucketLimiter(
+        rate=rate,
+        burst=getattr(settings, 'FORMS_RATE_LIMIT_BURST', 300),
+        max_keys=getattr(settings, 'FORMS_RATE_LIMIT_MAX_KEYS', 10_000),
+    )
+
+
+def _build_write_slots() -> WriteSlots | None:
+    limit = getattr(settings, 'FORMS_MAX_CONCURRENT_WRITES', None)
+    return WriteSlots(limit) if limit is not None else None
+
+
+rate_limiter = _build_limiter()
+write_slots = _build_write_slots()
+
+if rate_limiter is not None:
+    metrics.register_gauge('rate_limit_tracked_clients', lambda: len(rate_limiter))
+if write_slots is not None:
+    metrics.register_gauge('submission_writes_in_progress', lambda: write_slots.in_use)
+
+
+def client_ip(request: HttpRequest) -> str:
+    """
+    Return the address of the client that sent ``request``.
+
+    Behind ``FORMS_TRUSTED_PROXY_COUNT`` reverse proxies the client address
+    is the entry of ``X-Forwarded-For`` appended by the outermost of them,
+    i.e. that many entries from the right.  Entries further left were sent
+    by the client and cannot be trusted.  A request carrying fewer entries
+    did not pass through the proxies, so its peer address is used.
+    """
+    hops = getattr(settings, 'FORMS_TRUSTED_PROXY_COUNT', 0)
+    if hops > 0:
+        forwarded = [
+            entry.strip() for entry in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+            if entry.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _reject(request: HttpRequest, status: int, retry_after: int) -> HttpResponse:
+    response = render(request, 'busy.html', {'status': status}, status=status)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def admission_control(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+    """
+    Apply rate limiting and the write concurrency cap to POSTs of ``view``.
+
+    The wrapped view must take the form slug as its ``slug`` argument.  GET
+    requests pass through untouched.
+    """
+    @wraps(view)
+    def wrapped(request: HttpRequest, slug: str, *args, **kwargs) -> HttpResponse:
+        if request.method != 'POST':
+            return view(request, slug, *args, **kwargs)
+        if rate_limiter is not None:
+            allowed, retry_after = rate_limiter.acquire((client_ip(request), slug))
+            if not allowed:
+                metrics.increment('submissions_rate_limited')
+                return _reject(request, 429, retry_after)
+        if write_slots is None:
+            return view(request, slug, *args, **kwargs)
+        timeout = getattr(settings, 'FORMS_WRITE_SLOT_TIMEOUT', 0.5)
+        if not write_slots.acquire(timeout):
+            metrics.increment('submissions_rejected_overloaded')
+            return _reject(request, 503, 1)
+        try:
+            return view(request, slug, *args, **kwargs)
+        finally:
+            write_slots.release()
+
+    return wrapped
@@ -0,0 +1,29 @@
+"""
+Entry points for the export worker processes started by ``exports.iter_zip``.
+
+Workers are spawned as fresh interpreters, so this module must be importable
+before Django is set up: it does not import any models at module level.
+"""
+from __future__ import annotations
+
+import os
+
+
+def init_worker(settings_module: str) -> None:
+    """Set Django up in a freshly spawned export worker."""
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    import django
+
+    django.setup()
+
+
+def export_form(form_id: int, fmt: str) -> tuple[str, bytes]:
+    """Build one export in the worker, on the worker's own database connection."""
+    from django.db import connections
+
+    from .exports import export_form
+
+    try:
+        return export_form(form_id, fmt)
+    finally:
+        connections.close_all()
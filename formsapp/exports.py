@@ -0,0 +1,243 @@
+"""
+Building CSV and Excel exports of form responses.
+
+A form's export has one header row with the question texts followed by one
+row per response, oldest first; each cell holds the selected choice text or
+the free text answer.  Answers are read in chunks of responses rather than
+one query per cell, so memory and query count stay bounded for large forms.
+
+Several forms can be exported at once into a single ZIP archive with
+:func:`iter_zip`.  Each form is built in a separate worker process with
+its own database connection, so the work is spread over several CPU cores,
+and finished files are streamed into the archive as soon as they are ready.
+
+Only one batch export runs at a time per server process, using at most
+``FORMS_EXPORT_MAX_WORKERS`` workers; a second request is refused with
+:class:`ExportBusy` instead of starting another pool.  Workers are spawned
+with ``FORMS_EXPORT_PYTHON`` (default ``sys.executable``), which must be a
+Python interpreter: under uWSGI or mod_wsgi point it at the virtualenv's
+``python``, or set ``FORMS_EXPORT_MAX_WORKERS`` to 1 to build the files in
+the serving process instead.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Iterable, Iterator
+
+from . import export_worker
+from django.conf import settings
+
+from .models import Answer, Form
+
+CSV = 'csv'
+XLSX = 'xlsx'
+FORMATS = (CSV, XLSX)
+CONTENT_TYPES = {
+    CSV: 'text/csv',
+    XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+# Number of responses whose answers are fetched per query.  Kept below
+# SQLite's limit on the number of query parameters.
+CHUNK_SIZE = 500
+
+# Held while a batch export runs, so that concurrent requests cannot each
+# start a pool of worker processes.
+_batch_lock = threading.Lock()
+
+
+class ExportBusy(Exception):
+    """Raised by :func:`iter_zip` when another batch export is running."""
+
+
+def header_row(questions) -> list[str]:
+    return ['Submitted At'] + [q.text for q in questions]
+
+
+def response_rows(form_obj: Form, questions, chunk_size: int = CHUNK_SIZE) -> Iterator[list[str]]:
+    """Yield one row per response to ``form_obj`` in submission order."""
+    question_ids = [q.id for q in questions]
+    responses = list(
+        form_obj.responses.order_by('submitted_at', 'id').values_list('id', 'submitted_at')
+    )
+    for start in range(0, len(responses), chunk_size):
+        chunk = responses[start:start + chunk_size]
+        cells: dict[tuple[int, int], str] = {}
+        answers = (
+            Answer.objects.filter(response_id__in=[response_id for response_id, _ in chunk])
+            .order_by('id')
+            .values_list('response_id', 'question_id', 'text', 'choice__text')
+        )
+        for response_id, question_id, text, choice_text in answers.iterator():
+            # Keep the first answer per question, like the responses page
+            cells.setdefault((response_id, question_id), choice_text if choice_text is not None else text)
+        for response_id, submitted_at in chunk:
+            yield [submitted_at.isoformat()] + [
+                cells.get((response_id, question_id)) or '' for question_id in question_ids
+            ]
+
+
+def write_csv(form_obj: Form, out) -> None:
+    """Write the CSV export of ``form_obj`` to the text stream ``out``."""
+    questions = list(form_obj.questions.all())
+    writer = csv.writer(out)
+    writer.writerow(header_row(questions))
+    writer.writerows(response_rows(form_obj, questions))
+
+
+def build_workbook(form_obj: Form):
+    """
+    Return an openpyxl workbook holding the export of ``form_obj``.
+
+    Raises ``ImportError`` if openpyxl is not installed.
+    """
+    from openpyxl import Workbook  # type: ignore
+
+    questions = list(form_obj.questions.all())
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Responses')
+    ws.append(header_row(questions))
+    for row in response_rows(form_obj, questions):
+        ws.append(row)
+    return wb
+
+
+def export_filename(form_obj: Form, fmt: str) -> str:
+    return f'{form_obj.slug}.{fmt}'
+
+
+def export_form(form_id: int, fmt: str) -> tuple[str, bytes]:
+    """Build one export file and return its archive name and contents."""
+    form_obj = Form.objects.get(id=form_id)
+    if fmt == CSV:
+        out = io.StringIO()
+        write_csv(form_obj, out)
+        data = out.getvalue().encode('utf-8')
+    else:
+        out = io.BytesIO()
+        build_workbook(form_obj).save(out)
+        data = out.getvalue()
+    return export_filename(form_obj, fmt), data
+
+
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink that hands ``zipfile`` output over in chunks."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def max_workers() -> int:
+    return max(1, getattr(settings, 'FORMS_EXPORT_MAX_WORKERS', os.cpu_count() or 1))
+
+
+class _BatchExport:
+    """
+    Iterator over the archive chunks that frees the batch slot when done.
+
+    ``StreamingHttpResponse`` calls ``close`` when the response is closed,
+    also if the client went away before the first chunk was sent.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self._chunks.close()
+        if not self._released:
+            self._released = True
+            _batch_lock.release()
+
+
+def iter_zip(form_ids: Iterable[int], formats: Iterable[str] = (CSV,),
+             workers: int | None = None, wait: bool = False) -> Iterator[bytes]:
+    """
+    Build exports of several forms in parallel and return a ZIP archive.
+
+    Every ``(form, format)`` pair is built by a worker process; ``workers``
+    defaults to, and is capped at, ``FORMS_EXPORT_MAX_WORKERS``.  Files are
+    added to the archive in the order they finish.  The returned iterator
+    yields the archive bytes as they are produced, so the result can be
+    written to a file or streamed to a client.
+
+    Raises :class:`ExportBusy` if another batch export is running, unless
+    ``wait`` is true, in which case it waits for that export to finish.
+    """
+    form_ids, formats = list(form_ids), list(formats)
+    workers = min(workers or max_workers(), max_workers())
+    if not _batch_lock.acquire(blocking=wait):
+        raise ExportBusy('Another batch export is in progress.')
+    return _BatchExport(_zip_chunks(form_ids, formats, workers))
+
+
+def _build_parallel(jobs: list[tuple[int, str]], workers: int) -> Iterator[tuple[str, bytes]]:
+    settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'university_forms.settings')
+    # Spawned rather than forked workers: a forked child would share the
+    # parent's open database connection.
+    context = get_context('spawn')
+    executable = getattr(settings, 'FORMS_EXPORT_PYTHON', None)
+    if executable:
+        context.set_executable(executable)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=export_worker.init_worker,
+        initargs=(settings_module,),
+    ) as pool:
+        futures = [pool.submit(export_worker.export_form, form_id, fmt) for form_id, fmt in jobs]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        except BaseException:
+            # Client went away or a worker failed: drop the queued jobs.
+            pool.shutdown(cancel_futures=True)
+            raise
+
+
+def _zip_chunks(form_ids: list[int], formats: list[str], workers: int) -> Iterator[bytes]:
+    jobs = [(form_id, fmt) for form_id in form_ids for fmt in formats]
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, 'w')
+    workers = min(workers, len(jobs))
+    if workers > 1:
+        files = _build_parallel(jobs, workers)
+    else:
+        files = (export_form(form_id, fmt) for form_id, fmt in jobs)
+    try:
+        for name, data in files:
+            # xlsx files are zip archives already; compressing them again gains nothing.
+            compression = zipfile.ZIP_STORED if name.endswith('.' + XLSX) else zipfile.ZIP_DEFLATED
+            archive.writestr(name, data, compress_type=compression)
+            yield stream.pop()
+        archive.close()
+        yield stream.pop()
+    finally:
+        archive.close()
@@ -0,0 +1,35 @@
+"""
+Rebuild the hourly/daily submission rollups from the stored responses.
+
+Rollups are normally kept up to date as responses are submitted.  Run this
+command once after upgrading to populate them for existing responses, or at
+any time to repair them::
+
+    python manage.py backfill_rollups
+    python manage.py backfill_rollups 3 7
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from formsapp import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild submission rollups from Response.submitted_at.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'form_ids', nargs='*', type=int,
+            help='Ids of the forms to rebuild (default: all forms).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        form_ids = options['form_ids'] or None
+        started = time.monotonic()
+        written = rollups.rebuild(form_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} rollup rows in {time.monotonic() - started:.2f}s.'
+        ))
@@ -0,0 +1,143 @@
+"""
+Compare the cost of public form requests with and without the fixed locale.
+
+The command renders a form and submits it repeatedly through Django's WSGI
+handler, once with ``settings.MIDDLEWARE`` as configured and once with the
+``formsapp.middleware`` classes swapped back for their Django originals, and
+reports database queries and CPU time per request::
+
+    python manage.py benchmark_public my-form-slug --requests 500
+
+All writes are rolled back, so the command can be pointed at a live
+database.  Requests carry a session cookie, as a browser that has visited
+the site before would.
+"""
+from __future__ import annotations
+
+import re
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core import signals
+from django.db import close_old_connections, connection, transaction
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from formsapp.models import Form, Question
+
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def stock_middleware() -> list[str]:
+    """Return ``settings.MIDDLEWARE`` with the formsapp variants replaced by Django's."""
+    result = []
+    for path in settings.MIDDLEWARE:
+        cls = import_string(path)
+        if cls.__module__ == 'formsapp.middleware':
+            base = next(c for c in cls.__mro__ if c.__module__.startswith('django.'))
+            path = f'{base.__module__}.{base.__qualname__}'
+        result.append(path)
+    return result
+
+
+class Command(BaseCommand):
+    help = 'Benchmark public form requests with the configured and the stock middleware.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('slug', help='Slug of a published form to request.')
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Number of GET and of POST requests per round (default 200).',
+        )
+        parser.add_argument(
+            '--rounds', type=int, default=5,
+            help='Number of rounds per configuration; the fastest is reported (default 5).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            form_obj = Form.objects.get(slug=options['slug'], published=True)
+        except Form.DoesNotExist:
+            raise CommandError(f'No published form with slug "{options["slug"]}".')
+        count = options['requests']
+        data = {}
+        for question in form_obj.questions.prefetch_related('choices'):
+            if question.question_type == Question.TEXT:
+                data[f'question_{question.id}'] = 'benchmark'
+            else:
+                choice = question.choices.first()
+                data[f'question_{question.id}'] = str(choice.id) if choice else ''
+        url = reverse('formsapp:display_form', args=[form_obj.slug])
+
+        configurations = [
+            ('stock', stock_middleware()),
+            ('fixed', list(settings.MIDDLEWARE)),
+        ]
+        # Interleave the configurations and keep the fastest round of each so
+        # that noise from the rest of the machine does not decide the result.
+        results: dict[str, tuple[tuple[float, float], tuple[float, float]]] = {}
+        # Requests run inside a transaction that is rolled back, so the
+        # connection must not be closed at the end of each request.
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+        try:
+            for _ in range(options['rounds']):
+                for name, middleware in configurations:
+                    with override_settings(MIDDLEWARE=middleware):
+                        get_stats, post_stats = self._run(url, data, count)
+                    best = results.get(name)
+                    if best is not None:
+                        get_stats = min(get_stats, best[0], key=lambda stats: stats[1])
+                        post_stats = min(post_stats, best[1], key=lambda stats: stats[1])
+                    results[name] = (get_stats, post_stats)
+        finally:
+            signals.request_started.connect(close_old_connections)
+            signals.request_finished.connect(close_old_connections)
+
+        self.stdout.write(f'{count} GET and {count} POST requests to {url}, best of {options["rounds"]} rounds\n')
+        self.stdout.write(f'{"":8}{"GET queries":>14}{"GET CPU ms":>12}{"POST queries":>14}{"POST CPU ms":>13}')
+        for name, (get_stats, post_stats) in results.items():
+            self.stdout.write(
+                f'{name:8}{get_stats[0]:>14.2f}{get_stats[1]:>12.3f}'
+                f'{post_stats[0]:>14.2f}{post_stats[1]:>13.3f}'
+            )
+
+    def _run(self, url: str, data: dict, count: int) -> tuple[tuple[float, float], tuple[float, float]]:
+        """Return ``(queries, cpu_ms)`` per request for GETs and for POSTs."""
+        handler = WSGIHandler()
+        factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        with transaction.atomic():
+            session = import_module(settings.SESSION_ENGINE).SessionStore()
+            session['benchmark'] = True
+            session.save()
+            cookies = {settings.SESSION_COOKIE_NAME: session.session_key}
+            # Fetch the form once, as a browser would, to obtain the CSRF
+            # cookie and token that every submission has to carry.
+            response = handler(self._environ(factory.get(url), cookies), lambda *args: None)
+            html = b''.join(response).decode()
+            cookies[settings.CSRF_COOKIE_NAME] = response.cookies[settings.CSRF_COOKIE_NAME].value
+            post_data = dict(data, csrfmiddlewaretoken=CSRF_TOKEN_RE.search(html).group(1))
+            stats = []
+            for method in ('get', 'post'):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.process_time()
+                    for i in range(count):
+                        request = factory.post(url, post_data) if method == 'post' else factory.get(url)
+                        # A distinct address per request keeps the rate limiter out of the way
+                        environ = self._environ(request, cookies, REMOTE_ADDR=f'10.0.{i // 256 % 256}.{i % 256}')
+                        b''.join(handler(environ, lambda *args: None))
+                    elapsed = time.process_time() - started
+                stats.append((len(queries) / count, elapsed * 1000 / count))
+            transaction.set_rollback(True)
+        return stats[0], stats[1]
+
+    @staticmethod
+    def _environ(request, cookies: dict[str, str], **extra) -> dict:
+        environ = dict(request.environ, **extra)
+        environ['HTTP_COOKIE'] = '; '.join(f'{key}={value}' for key, value in cookies.items())
+        return environ
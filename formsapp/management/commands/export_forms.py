@@ -0,0 +1,70 @@
+"""
+Export the responses of several forms into a single ZIP archive.
+
+Each form is exported by its own worker process, so exporting many forms
+at the end of a semester takes roughly as long as the largest one divided
+over the available cores rather than the sum of all of them::
+
+    python manage.py export_forms 3 4 7 --output semester.zip
+    python manage.py export_forms --all --format csv --format xlsx --output all.zip
+
+Archived forms are skipped.
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from formsapp import exports
+from formsapp.models import Form
+
+
+class Command(BaseCommand):
+    help = 'Export the responses of several forms into one ZIP archive.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('form_ids', nargs='*', type=int, help='Ids of the forms to export.')
+        parser.add_argument('--all', action='store_true', help='Export every non-archived form.')
+        parser.add_argument(
+            '--format', dest='formats', action='append', choices=exports.FORMATS,
+            help='Export format; may be given twice (default csv).',
+        )
+        parser.add_argument('--output', '-o', required=True, help='Path of the ZIP file to write.')
+        parser.add_argument(
+            '--workers', type=int,
+            help='Number of worker processes (default and maximum: FORMS_EXPORT_MAX_WORKERS).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options['all'] == bool(options['form_ids']):
+            raise CommandError('Give either form ids or --all.')
+        forms = Form.objects.order_by('id')
+        if not options['all']:
+            forms = forms.filter(id__in=options['form_ids'])
+        forms = list(forms.values_list('id', 'title', 'archived'))
+        missing = set(options['form_ids']) - {form_id for form_id, _, _ in forms}
+        if missing:
+            raise CommandError(f'Unknown form ids: {", ".join(map(str, sorted(missing)))}')
+        for form_id, title, archived in forms:
+            if archived:
+                self.stderr.write(self.style.WARNING(f'Skipping archived form {form_id} "{title}".'))
+        form_ids = [form_id for form_id, _, archived in forms if not archived]
+        if not form_ids:
+            raise CommandError('Nothing to export.')
+        formats = options['formats'] or [exports.CSV]
+
+        output = Path(options['output'])
+        started = time.monotonic()
+        try:
+            with output.open('wb') as fh:
+                for chunk in exports.iter_zip(form_ids, formats, workers=options['workers'], wait=True):
+                    fh.write(chunk)
+        except BaseException:
+            output.unlink(missing_ok=True)
+            raise
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {len(form_ids)} forms ({", ".join(formats)}) to {output} '
+            f'in {time.monotonic() - started:.2f}s.'
+        ))
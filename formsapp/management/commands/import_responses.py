@@ -0,0 +1,336 @@
+"""
+Bulk import responses for an existing form from a CSV or JSONL file.
+
+This is intended for migrating surveys collected on paper or in other
+tools.  Posting every response through ``display_form`` would create each
+``Response`` and ``Answer`` with its own query; this command instead
+resolves questions and choices once through in-memory lookups and inserts
+rows in chunked multi-row statements, one transaction per batch::
+
+    python manage.py import_responses my-form-slug responses.csv
+    python manage.py import_responses 12 responses.jsonl --batch-size 10000
+
+Columns (CSV header cells or JSONL object keys) are matched to questions by
+their text, by their id, or by the ``question_<id>`` field name used on the
+public form.  A ``Submitted At`` (or ``submitted_at``) column is used as the
+submission time; without it the time of import is used.  Multiple choice
+values may be either the choice text or the choice id.  The files produced
+by ``export_responses_csv`` can therefore be imported unchanged.
+
+As in ``display_form`` every response receives one answer per question;
+questions without a column get an empty answer.  Unknown choice values are
+stored as free text and reported as warnings.  The submission rollups are
+updated along with each batch.  Rows that cannot be parsed
+are skipped and reported as errors.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from formsapp import rollups
+from formsapp.models import Answer, Choice, Form, Question, Response
+
+SUBMITTED_AT_KEYS = ('submitted at', 'submitted_at')
+# Marker returned by ``Command._resolve_column`` for the submission time column.
+SUBMITTED_AT = 'submitted_at'
+# Number of individual problems printed before the report is truncated.
+MAX_REPORTED_PROBLEMS = 20
+
+
+class Command(BaseCommand):
+    help = 'Import responses for an existing form from a CSV or JSONL file.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('form', help='Id or slug of the form to import into.')
+        parser.add_argument('path', help='Path to the CSV or JSONL file.')
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help='File format.  Inferred from the file extension when omitted.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of responses inserted per transaction (default 5000).',
+        )
+        parser.add_argument(
+            '--encoding', default='utf-8-sig',
+            help='Text encoding of the input file (default utf-8-sig).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        form_obj = self._get_form(options['form'])
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'File not found: {path}')
+        fmt = options['format'] or ('jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('The database backend does not support INSERT ... RETURNING.')
+
+        questions = list(form_obj.questions.all())
+        if not questions:
+            raise CommandError(f'Form "{form_obj.title}" has no questions.')
+        self.column_lookup = self._build_column_lookup(questions)
+        self.choice_lookup = self._build_choice_lookup(questions)
+        self.questions = questions
+        self.form_id = form_obj.id
+        self.errors: list[str] = []
+        self.warnings: list[str] = []
+        self.error_count = 0
+        self.warning_count = 0
+        self.resolved_columns: dict = {}
+        self.import_time = timezone.now()
+        self.tz = timezone.get_current_timezone()
+
+        self.stdout.write(f'Importing {fmt.upper()} from {path} into "{form_obj.title}"...')
+        started = time.monotonic()
+        imported = 0
+        with path.open(newline='', encoding=options['encoding']) as fh:
+            rows = self._read_csv(fh) if fmt == 'csv' else self._read_jsonl(fh)
+            batch: list[tuple[datetime, dict[int, tuple[str, int | None]]]] = []
+            for line_no, cells in rows:
+                parsed = self._parse_record(line_no, cells)
+                if parsed is None:
+                    continue
+                batch.append(parsed)
+                if len(batch) >= batch_size:
+                    imported += self._insert_batch(batch)
+                    batch = []
+                    self._report_progress(imported, started)
+            if batch:
+                imported += self._insert_batch(batch)
+        elapsed = max(time.monotonic() - started, 1e-9)
+
+        self._print_problems('Warning', self.warnings, self.warning_count)
+        self._print_problems('Error', self.errors, self.error_count)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} responses in {elapsed:.2f}s '
+            f'({imported / elapsed:,.0f} responses/s); '
+            f'{self.error_count} rows skipped, {self.warning_count} warnings.'
+        ))
+
+    # ------------------------------------------------------------------
+    # Lookups
+
+    def _get_form(self, value: str) -> Form:
+        lookup = {'id': int(value)} if value.isdigit() else {'slug': value}
+        try:
+            return Form.objects.get(**lookup)
+        except Form.DoesNotExist:
+            raise CommandError(f'Form "{value}" does not exist.')
+
+    @staticmethod
+    def _build_column_lookup(questions: list[Question]) -> dict[str, Question]:
+        """Map normalised column names (text, id, ``question_<id>``) to questions."""
+        lookup: dict[str, Question] = {}
+        for q in questions:
+            lookup.setdefault(q.text.strip().casefold(), q)
+        for q in questions:
+            lookup[str(q.id)] = q
+            lookup[f'question_{q.id}'] = q
+        return lookup
+
+    @staticmethod
+    def _build_choice_lookup(questions: list[Question]) -> dict[int, dict[str, tuple[int, str]]]:
+        """Map question id -> {choice text or id: (choice id, choice text)}."""
+        lookup: dict[int, dict[str, tuple[int, str]]] = {
+            q.id: {} for q in questions if q.question_type == Question.MULTIPLE_CHOICE
+        }
+        for choice_id, question_id, text in Choice.objects.filter(
+            question_id__in=lookup.keys()
+        ).values_list('id', 'question_id', 'text'):
+            choices = lookup[question_id]
+            choices.setdefault(text.strip().casefold(), (choice_id, text))
+            choices[str(choice_id)] = (choice_id, text)
+        return lookup
+
+    def _resolve_column(self, key) -> Question | str | None:
+        """
+        Return the question for a column, ``SUBMITTED_AT`` or ``None``.
+
+        Results are cached per raw key so that each distinct column name is
+        only normalised once per import.
+        """
+        try:
+            return self.resolved_columns[key]
+        except KeyError:
+            pass
+        norm = str(key).strip().casefold()
+        if norm in SUBMITTED_AT_KEYS:
+            target = SUBMITTED_AT
+        else:
+            target = self.column_lookup.get(norm)
+            if target is None:
+                self.warning_count += 1
+                self.warnings.append(f'column {key!r} does not match any question and was ignored')
+        self.resolved_columns[key] = target
+        return target
+
+    # ------------------------------------------------------------------
+    # Reading
+
+    def _read_csv(self, fh) -> Iterator[tuple[int, list[tuple[Question | str, str]]]]:
+        reader = csv.reader(fh)
+        try:
+            header = next(reader)
+        except StopIteration:
+            return
+        # Resolve the header once; rows are then read by column index.
+        columns = [
+            (index, target) for index, target in
+            ((index, self._resolve_column(key)) for index, key in enumerate(header))
+            if target is not None
+        ]
+        width = len(header)
+        for line_no, values in enumerate(reader, start=2):
+            if not any(values):
+                continue
+            if len(values) >= width:
+                yield line_no, [(target, values[index]) for index, target in columns]
+            else:
+                yield line_no, [(target, values[index]) for index, target in columns if index < len(values)]
+
+    def _read_jsonl(self, fh) -> Iterator[tuple[int, list[tuple[Question | str, object]]]]:
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                self._error(line_no, f'invalid JSON ({exc.msg})')
+                continue
+            if not isinstance(record, dict):
+                self._error(line_no, 'expected a JSON object')
+                continue
+            cells = []
+            for key, raw in record.items():
+                target = self._resolve_column(key)
+                if target is not None:
+                    cells.append((target, raw))
+            yield line_no, cells
+
+    def _parse_record(self, line_no: int, cells: list[tuple[Question | str, object]]):
+        """Turn the ``(target, raw value)`` cells of one record into a submission time and answers."""
+        submitted_at = self.import_time
+        values: dict[int, tuple[str, int | None]] = {}
+        for target, raw in cells:
+            if target is SUBMITTED_AT:
+                if raw in (None, ''):
+                    continue
+                try:
+                    parsed = parse_datetime(raw.strip()) if isinstance(raw, str) else None
+                except ValueError:
+                    # Well formed but impossible, e.g. 2024-02-30
+                    parsed = None
+                if parsed is None:
+                    self._error(line_no, f'invalid submission time {raw!r}')
+                    return None
+                if timezone.is_naive(parsed):
+                    parsed = timezone.make_aware(parsed, self.tz)
+                submitted_at = parsed
+                continue
+            text = '' if raw is None else str(raw).strip()
+            choice_id = None
+            if text and target.question_type == Question.MULTIPLE_CHOICE:
+                choice = self.choice_lookup[target.id].get(text.casefold())
+                if choice is None:
+                    # Same fallback as ``display_form``: keep the raw value as text.
+                    self._warning(line_no, f'unknown choice {text!r} for "{target.text}"; stored as text')
+                else:
+                    choice_id, text = choice
+            values[target.id] = (text, choice_id)
+        return submitted_at, values
+
+    # ------------------------------------------------------------------
+    # Writing
+
+    def _insert_batch(self, batch: list[tuple[datetime, dict[int, tuple[str, int | None]]]]) -> int:
+        """
+        Insert one batch of responses and their answers in a single transaction.
+
+        Building a model instance per row dominates the cost of
+        ``bulk_create``, so rows are written with plain SQL instead: responses
+        with multi-row ``INSERT ... RETURNING`` statements to learn their
+        primary keys, answers with a single ``executemany``.
+        """
+        form_id = self.form_id
+        adapt = connection.ops.adapt_datetimefield_value
+        chunk_size = connection.ops.bulk_batch_size(['form', 'submitted_at'], batch)
+        response_ids: list[int] = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(batch), chunk_size):
+                chunk = batch[start:start + chunk_size]
+                params: list = []
+                for submitted_at, _ in chunk:
+                    params.append(form_id)
+                    params.append(adapt(submitted_at))
+                cursor.execute(self._response_insert_sql(len(chunk)), params)
+                response_ids.extend(row[0] for row in cursor.fetchall())
+            empty = ('', None)
+            question_ids = [q.id for q in self.questions]
+            rows = [
+                (response_id, question_id, *values.get(question_id, empty))
+                for response_id, (_, values) in zip(response_ids, batch)
+                for question_id in question_ids
+            ]
+            cursor.executemany(self.answer_insert_sql, rows)
+            rollups.add_counts(form_id, rollups.count_submissions(
+                submitted_at for submitted_at, _ in batch
+            ))
+        return len(batch)
+
+    def _response_insert_sql(self, count: int) -> str:
+        qn = connection.ops.quote_name
+        meta = Response._meta
+        columns = ', '.join(qn(meta.get_field(name).column) for name in ('form', 'submitted_at'))
+        values = ', '.join(['(%s, %s)'] * count)
+        return (
+            f'INSERT INTO {qn(meta.db_table)} ({columns}) VALUES {values} '
+            f'RETURNING {qn(meta.pk.column)}'
+        )
+
+    @cached_property
+    def answer_insert_sql(self) -> str:
+        qn = connection.ops.quote_name
+        columns = ', '.join(
+            qn(Answer._meta.get_field(name).column)
+            for name in ('response', 'question', 'text', 'choice')
+        )
+        return f'INSERT INTO {qn(Answer._meta.db_table)} ({columns}) VALUES (%s, %s, %s, %s)'
+
+    # ------------------------------------------------------------------
+    # Reporting
+
+    def _report_progress(self, imported: int, started: float) -> None:
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(f'  {imported:,} responses imported ({imported / elapsed:,.0f}/s)')
+
+    def _warning(self, line_no: int, message: str) -> None:
+        self.warning_count += 1
+        if len(self.warnings) < MAX_REPORTED_PROBLEMS:
+            self.warnings.append(f'line {line_no}: {message}')
+
+    def _error(self, line_no: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_PROBLEMS:
+            self.errors.append(f'line {line_no}: {message}')
+
+    def _print_problems(self, label: str, problems: list[str], total: int) -> None:
+        for problem in problems:
+            style = self.style.ERROR if label == 'Error' else self.style.WARNING
+            self.stderr.write(style(f'{label}: {problem}'))
+        if total > len(problems):
+            self.stderr.write(f'... and {total - len(problems)} more {label.lower()}s')
@@ -0,0 +1,39 @@
+"""
+In-process counters and gauges for operational metrics.
+
+Counters are kept in memory per worker process and reset when the process
+restarts.  They are cheap enough to update on every request.  Gauges are
+callables registered once and evaluated whenever a snapshot is taken.  Both
+are exposed to administrators through ``views.metrics_view``.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Callable
+
+_lock = threading.Lock()
+_counters: Counter[str] = Counter()
+_gauges: dict[str, Callable[[], float]] = {}
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """Add ``amount`` to the counter called ``name``."""
+    with _lock:
+        _counters[name] += amount
+
+
+def register_gauge(name: str, func: Callable[[], float]) -> None:
+    """Report the current value of ``func()`` as ``name`` in snapshots."""
+    with _lock:
+        _gauges[name] = func
+
+
+def snapshot() -> dict[str, float]:
+    """Return a copy of all counters together with the current gauge values."""
+    with _lock:
+        values: dict[str, float] = dict(_counters)
+        gauges = list(_gauges.items())
+    for name, func in gauges:
+        values[name] = func()
+    return values
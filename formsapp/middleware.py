@@ -0,0 +1,43 @@
+"""
+Locale middleware that serves public form pages in a fixed language.
+
+Respondents always see public forms in English, so negotiating a language
+from the URL, cookie and ``Accept-Language`` header is wasted work there.
+``PublicLocaleMiddleware`` behaves exactly like Django's ``LocaleMiddleware``,
+except that for requests whose path starts with one of
+``FORMS_PUBLIC_PATH_PREFIXES`` it activates ``FORMS_PUBLIC_LANGUAGE``
+directly.
+
+The public views activate the same language themselves, so setting
+``FORMS_PUBLIC_PATH_PREFIXES`` to an empty tuple only restores negotiation;
+the pages are still rendered in English.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.middleware.locale import LocaleMiddleware
+from django.utils import translation
+
+
+def is_public_path(path: str) -> bool:
+    """Return whether ``path`` belongs to the public form pages."""
+    return path.startswith(tuple(getattr(settings, 'FORMS_PUBLIC_PATH_PREFIXES', ())))
+
+
+def public_language() -> str:
+    return getattr(settings, 'FORMS_PUBLIC_LANGUAGE', 'en')
+
+
+class PublicLocaleMiddleware(LocaleMiddleware):
+    """Serve public form pages in a fixed language without negotiation."""
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not is_public_path(request.path_info):
+            return super().__call__(request)
+        language = public_language()
+        translation.activate(language)
+        request.LANGUAGE_CODE = language
+        response = self.get_response(request)
+        response.headers.setdefault('Content-Language', language)
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsapp', '0002_form_extra_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='formsapp.form')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='submissionrollup',
+            constraint=models.UniqueConstraint(fields=('form', 'period', 'bucket_start'), name='unique_submission_rollup_bucket'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsapp', '0003_submissionrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='response',
+            name='submitted_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
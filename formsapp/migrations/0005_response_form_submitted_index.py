@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formsapp', '0004_response_submitted_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['form', 'submitted_at'], name='response_form_submitted_idx'),
+        ),
+    ]
@@ -11,6 +11,9 @@ choices from which the respondent selects one.
 Responses are stored along with their individual answers.  Answers may be
 associated with a choice (for multiple choice questions) and/or contain
 free text.
+
+Submission counts per form and per hour/day are kept in a separate rollup
+table so that charts of submissions over time do not scan every response.
 """
 from __future__ import annotations
 
@@ -73,7 +76,15 @@ class Response(models.Model):
     """A single response to a form."""
 
     form = models.ForeignKey(Form, related_name='responses', on_delete=models.CASCADE)
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    # Indexed for the date hierarchy of the Django admin and time-ordered listings.
+    submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Earliest/latest submission of one form, for the admin date
+            # hierarchy filtered by form and for exports in submission order.
+            models.Index(fields=['form', 'submitted_at'], name='response_form_submitted_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"Response to {self.form.title} at {self.submitted_at}"
@@ -88,4 +99,38 @@ class Answer(models.Model):
     choice = models.ForeignKey(Choice, related_name='answers', null=True, blank=True, on_delete=models.SET_NULL)
 
     def __str__(self) -> str:
-        return f"Answer to {self.question.text}"
\ No newline at end of file
+        return f"Answer to {self.question.text}"
+
+
+class SubmissionRollup(models.Model):
+    """
+    Number of responses a form received in one hour or one day.
+
+    Buckets start on hour/day boundaries in ``settings.TIME_ZONE``.  Rows are
+    incremented as responses are saved (see ``formsapp.rollups``) and can be
+    rebuilt from ``Response.submitted_at`` with the ``backfill_rollups``
+    management command.
+    """
+
+    HOUR = 'hour'
+    DAY = 'day'
+    PERIODS = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+
+    form = models.ForeignKey(Form, related_name='rollups', on_delete=models.CASCADE)
+    period = models.CharField(max_length=4, choices=PERIODS)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['form', 'period', 'bucket_start'],
+                name='unique_submission_rollup_bucket',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.count} responses to form {self.form_id} ({self.period} of {self.bucket_start})"
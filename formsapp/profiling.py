@@ -0,0 +1,210 @@
+"""
+On-demand profiling of the views in ``formsapp.views``.
+
+``ProfilingMiddleware`` runs a view under ``cProfile`` when either
+
+* a staff user adds ``?_profile=1`` to the URL or sends an
+  ``X-Profile: 1`` header, or
+* the request is picked at random with probability
+  ``FORMS_PROFILE_SAMPLE_RATE`` (``0`` disables sampling).
+
+Each profile is written to ``FORMS_PROFILE_DIR`` as a ``.prof`` file that
+can be loaded with :mod:`pstats` or tools such as snakeviz, plus a ``.json``
+file describing the request: view name, form id or slug, status, the
+exception raised by the view (if any), duration and a breakdown of the SQL
+queries executed.  Only the newest ``FORMS_PROFILE_KEEP`` profiles are
+kept.  Staff can browse them at ``/admin/profiles/``.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import random
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connection
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils import timezone
+
+PROFILED_MODULE = 'formsapp.views'
+QUERY_PARAM = '_profile'
+HEADER = 'HTTP_X_PROFILE'
+
+# Status codes Django's exception handling turns these view exceptions into.
+EXCEPTION_STATUS = {
+    Http404: 404,
+    PermissionDenied: 403,
+}
+
+# Profile ids are generated by ``_profile_id`` and used as file names.
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{12}-[A-Za-z0-9_]+(-[A-Za-z0-9_-]+)?$')
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, 'FORMS_PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+class _QueryRecorder:
+    """``connection.execute_wrapper`` hook that times every SQL statement."""
+
+    def __init__(self) -> None:
+        self.stats: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            entry = self.stats[sql]
+            entry[0] += 1
+            entry[1] += time.perf_counter() - started
+
+    def summary(self, limit: int = 25) -> dict:
+        queries = sorted(self.stats.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'count': sum(count for count, _ in self.stats.values()),
+            'time_ms': round(sum(elapsed for _, elapsed in self.stats.values()) * 1000, 3),
+            'queries': [
+                {'sql': sql, 'count': count, 'time_ms': round(elapsed * 1000, 3)}
+                for sql, (count, elapsed) in queries[:limit]
+            ],
+        }
+
+
+class ProfilingMiddleware:
+    """Profile selected requests to ``formsapp.views`` and store the results."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'FORMS_PROFILE_SAMPLE_RATE', 0.0)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        return self.get_response(request)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        if view_func.__module__ != PROFILED_MODULE:
+            return None
+        trigger = self._trigger(request)
+        if trigger is None:
+            return None
+        profiler = cProfile.Profile()
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        status = 500
+        exception = None
+        try:
+            with connection.execute_wrapper(recorder):
+                response = profiler.runcall(view_func, request, *view_args, **view_kwargs)
+            status = response.status_code
+            return response
+        except Exception as exc:
+            exception = type(exc).__name__
+            status = EXCEPTION_STATUS.get(type(exc), 500)
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            save_profile(
+                profiler,
+                view=f'{view_func.__module__}.{view_func.__name__}',
+                request=request,
+                view_kwargs=view_kwargs,
+                status=status,
+                duration=duration,
+                sql=recorder.summary(),
+                trigger=trigger,
+                exception=exception,
+            )
+
+    def _trigger(self, request: HttpRequest) -> str | None:
+        requested = request.GET.get(QUERY_PARAM) == '1' or request.META.get(HEADER) == '1'
+        if requested:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_staff:
+                return 'staff'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+
+def _profile_id(view_name: str, view_kwargs: dict) -> str:
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    target = view_kwargs.get('form_id') or view_kwargs.get('slug')
+    suffix = f'-{target}' if target is not None else ''
+    return f'{stamp}-{view_name.rsplit(".", 1)[-1]}{suffix}'
+
+
+def save_profile(profiler: cProfile.Profile, *, view: str, request: HttpRequest,
+                 view_kwargs: dict, status: int, duration: float, sql: dict,
+                 trigger: str, exception: str | None = None) -> str:
+    """Write the profile and its metadata; return the profile id."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = _profile_id(view, view_kwargs)
+    profiler.dump_stats(directory / f'{profile_id}.prof')
+    meta = {
+        'id': profile_id,
+        'view': view,
+        'method': request.method,
+        'path': request.path,
+        'form_id': view_kwargs.get('form_id'),
+        'form_slug': view_kwargs.get('slug'),
+        'status': status,
+        'exception': exception,
+        'duration_ms': round(duration * 1000, 3),
+        'created_at': timezone.now().isoformat(),
+        'trigger': trigger,
+        'sql': sql,
+    }
+    (directory / f'{profile_id}.json').write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    _prune(directory)
+    return profile_id
+
+
+def _prune(directory: Path) -> None:
+    keep = getattr(settings, 'FORMS_PROFILE_KEEP', 100)
+    for meta_path in sorted(directory.glob('*.json'), reverse=True)[keep:]:
+        meta_path.unlink(missing_ok=True)
+        meta_path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def recent_profiles(limit: int = 100) -> list[dict]:
+    """Return the metadata of the newest stored profiles, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for meta_path in sorted(directory.glob('*.json'), reverse=True)[:limit]:
+        try:
+            profiles.append(json.loads(meta_path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_profile(profile_id: str, limit: int = 40) -> tuple[dict, str] | None:
+    """
+    Return the metadata of a stored profile and its hottest functions.
+
+    The function listing is the ``pstats`` report sorted by cumulative time.
+    Returns ``None`` if no such profile exists.
+    """
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    directory = profile_dir()
+    meta_path = directory / f'{profile_id}.json'
+    prof_path = directory / f'{profile_id}.prof'
+    if not meta_path.is_file() or not prof_path.is_file():
+        return None
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    out = io.StringIO()
+    stats = pstats.Stats(str(prof_path), stream=out)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return meta, out.getvalue()
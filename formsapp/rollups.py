@@ -0,0 +1,169 @@
+"""
+Maintenance and querying of the hourly/daily submission rollups.
+
+``SubmissionRollup`` rows hold the number of responses each form received
+per hour and per day in ``settings.TIME_ZONE``.  They are incremented as
+responses are saved and can be rebuilt from ``Response.submitted_at`` at any
+time, so charts of submissions over time read a bounded number of rows
+instead of scanning the response table.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import Response, SubmissionRollup
+
+PERIODS = (SubmissionRollup.HOUR, SubmissionRollup.DAY)
+_STEPS = {
+    SubmissionRollup.HOUR: timedelta(hours=1),
+    SubmissionRollup.DAY: timedelta(days=1),
+}
+
+
+def bucket_start(value: datetime, period: str) -> datetime:
+    """Return the start of the hour or day containing ``value`` in local time."""
+    local = timezone.localtime(value)
+    if period == SubmissionRollup.HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_counts(form_id: int, counts: Counter[tuple[str, datetime]]) -> None:
+    """
+    Add ``counts`` keyed by ``(period, bucket_start)`` to the rollups of a form.
+
+    The existing buckets in the affected range are read with one query and
+    updated with one ``executemany``; missing buckets are created in bulk.
+    """
+    if not counts:
+        return
+    starts = [start for _, start in counts]
+    with transaction.atomic():
+        existing = {
+            (period, start): pk
+            for pk, period, start in SubmissionRollup.objects.filter(
+                form_id=form_id, bucket_start__gte=min(starts), bucket_start__lte=max(starts),
+            ).values_list('id', 'period', 'bucket_start')
+        }
+        updates = [(amount, existing[key]) for key, amount in counts.items() if key in existing]
+        missing = {key: amount for key, amount in counts.items() if key not in existing}
+        if updates:
+            with connection.cursor() as cursor:
+                cursor.executemany(_update_sql(), updates)
+        if missing:
+            try:
+                with transaction.atomic():
+                    SubmissionRollup.objects.bulk_create([
+                        SubmissionRollup(form_id=form_id, period=period, bucket_start=start, count=amount)
+                        for (period, start), amount in missing.items()
+                    ])
+            except IntegrityError:
+                # Another request created some of the buckets first.
+                for (period, start), amount in missing.items():
+                    _add_one(form_id, period, start, amount)
+
+
+def _add_one(form_id: int, period: str, start: datetime, amount: int) -> None:
+    filters = {'form_id': form_id, 'period': period, 'bucket_start': start}
+    if SubmissionRollup.objects.filter(**filters).update(count=F('count') + amount):
+        return
+    try:
+        with transaction.atomic():
+            SubmissionRollup.objects.create(count=amount, **filters)
+    except IntegrityError:
+        SubmissionRollup.objects.filter(**filters).update(count=F('count') + amount)
+
+
+def _update_sql() -> str:
+    qn = connection.ops.quote_name
+    meta = SubmissionRollup._meta
+    count = qn(meta.get_field('count').column)
+    return f'UPDATE {qn(meta.db_table)} SET {count} = {count} + %s WHERE {qn(meta.pk.column)} = %s'
+
+
+def count_submissions(submitted_at: Iterable[datetime]) -> Counter[tuple[str, datetime]]:
+    """Group submission times into ``(period, bucket_start)`` counts."""
+    # Count per quarter hour first and convert each quarter hour to local
+    # time once.  UTC offsets are whole quarter hours, so a quarter hour
+    # never straddles two local hours.
+    quarters: Counter[datetime] = Counter()
+    for value in submitted_at:
+        quarters[value.replace(minute=value.minute - value.minute % 15, second=0, microsecond=0)] += 1
+    tz = timezone.get_current_timezone()
+    counts: Counter[tuple[str, datetime]] = Counter()
+    for quarter, amount in quarters.items():
+        hour = quarter.astimezone(tz).replace(minute=0, second=0, microsecond=0)
+        counts[SubmissionRollup.HOUR, hour] += amount
+        counts[SubmissionRollup.DAY, hour.replace(hour=0)] += amount
+    return counts
+
+
+def record_submission(response: Response) -> None:
+    """Count a newly saved response in its hour and day buckets."""
+    add_counts(response.form_id, count_submissions([response.submitted_at]))
+
+
+@transaction.atomic
+def rebuild(form_ids: Iterable[int] | None = None) -> int:
+    """
+    Recompute the rollups of the given forms (all forms if ``None``).
+
+    Returns the number of rollup rows written.
+    """
+    responses = Response.objects.all()
+    rollups = SubmissionRollup.objects.all()
+    if form_ids is not None:
+        form_ids = list(form_ids)
+        responses = responses.filter(form_id__in=form_ids)
+        rollups = rollups.filter(form_id__in=form_ids)
+    rollups.delete()
+    written = 0
+    for period, trunc in ((SubmissionRollup.HOUR, TruncHour), (SubmissionRollup.DAY, TruncDay)):
+        rows = (
+            responses.order_by()
+            .annotate(bucket=trunc('submitted_at'))
+            .values('form_id', 'bucket')
+            .annotate(n=Count('id'))
+            .values_list('form_id', 'bucket', 'n')
+        )
+        objs = [
+            SubmissionRollup(form_id=form_id, period=period, bucket_start=bucket, count=n)
+            for form_id, bucket, n in rows.iterator()
+        ]
+        SubmissionRollup.objects.bulk_create(objs, batch_size=1000)
+        written += len(objs)
+    return written
+
+
+def series(form_ids: Iterable[int], period: str, buckets: int, now: datetime | None = None) -> dict[int, list[tuple[datetime, int]]]:
+    """
+    Return the last ``buckets`` hourly or daily counts for each form.
+
+    Empty buckets are filled with zero so every series has exactly
+    ``buckets`` entries ending with the current hour/day.  The query reads
+    at most ``buckets`` rows per form, whatever the size of the history.
+    """
+    form_ids = list(form_ids)
+    step = _STEPS[period]
+    last = bucket_start(now or timezone.now(), period)
+    starts = [last - step * i for i in range(buckets - 1, -1, -1)]
+    # Daily buckets across a DST change are not exactly 24 hours apart, so
+    # normalise every start through bucket_start.
+    starts = [bucket_start(start, period) for start in starts]
+    found: dict[tuple[int, datetime], int] = {
+        (form_id, start): count
+        for form_id, start, count in SubmissionRollup.objects.filter(
+            form_id__in=form_ids, period=period, bucket_start__gte=starts[0],
+        ).values_list('form_id', 'bucket_start', 'count')
+    }
+    return {
+        form_id: [(start, found.get((form_id, start), 0)) for start in starts]
+        for form_id in form_ids
+    }
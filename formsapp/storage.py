@@ -0,0 +1,84 @@
+"""
+Static file storage used when the site runs in production mode.
+
+``collectstatic`` copies every asset to ``STATIC_ROOT`` under a name that
+contains a hash of its content (``styles.3f2a9c1b.css``) and records the
+mapping in ``staticfiles.json``.  Because a changed file always gets a new
+name, the web server can tell browsers to cache static files forever.
+
+Alongside each hashed file a gzip (``.gz``) and a brotli (``.br``) variant
+are written so
+that the web server can send precompressed bytes instead of compressing on
+every request.  An nginx configuration serving ``STATIC_ROOT`` would look
+like::
+
+    location /static/ {
+        alias /var/www/formmaker/static/;
+        gzip_static on;
+        brotli_static on;  # requires ngx_brotli
+        expires max;
+        add_header Cache-Control "public, immutable";
+    }
+"""
+from __future__ import annotations
+
+import gzip
+from typing import Iterator
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+import brotli  # type: ignore
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes gzip/brotli copies of text assets."""
+
+    # Only text formats benefit from compression; images and fonts are
+    # already compressed.
+    compress_extensions = ('.css', '.js', '.svg', '.txt', '.json', '.xml', '.html')
+    # Files smaller than this are not worth an extra request negotiation.
+    min_compress_size = 256
+    # Look files missing from the manifest up on disk instead of raising;
+    # see ``stored_name`` for files that are not there either.
+    manifest_strict = False
+
+    def stored_name(self, name: str) -> str:
+        """
+        Return the hashed name of ``name``, or ``name`` itself if the file
+        has not been collected, so that error pages can always be rendered.
+        """
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run: bool = False, **options) -> Iterator:
+        hashed_names: set[str] = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(self.compress_extensions):
+                self._write_compressed(hashed_name)
+
+    def _write_compressed(self, name: str) -> None:
+        """Write ``name.gz`` (and ``name.br``) if they are smaller than ``name``."""
+        with self.open(name) as fh:
+            data = fh.read()
+        if len(data) < self.min_compress_size:
+            return
+        variants = [
+            ('.gz', gzip.compress(data, compresslevel=9, mtime=0)),
+            ('.br', brotli.compress(data, quality=11)),
+        ]
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            target = name + suffix
+            if self.exists(target):
+                self.delete(target)
+            self._save(target, ContentFile(compressed))
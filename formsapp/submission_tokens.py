@@ -0,0 +1,53 @@
+"""
+Per-render submission tokens used to make form submissions idempotent.
+
+Every time a public form is rendered it carries a fresh random token in a
+hidden field.  When the form is posted the token is claimed in the
+``submissions`` cache; a second POST with the same token (a double click on
+Submit or a browser retry) finds it already claimed and is answered without
+writing to the database again.
+
+The cache alias is configured in ``settings.CACHES``.  Its ``TIMEOUT`` bounds
+how long a token is remembered and ``MAX_ENTRIES`` bounds memory use, older
+entries being evicted first.  The default in-memory cache is per process;
+point the alias at a shared cache when running several worker processes.
+"""
+from __future__ import annotations
+
+import re
+import uuid
+
+from django.core.cache import caches
+
+CACHE_ALIAS = 'submissions'
+FIELD_NAME = 'submission_token'
+
+_TOKEN_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def issue_token() -> str:
+    """Return a new token to embed in a rendered form."""
+    return uuid.uuid4().hex
+
+
+def _key(form_id: int, token: str) -> str:
+    return f'submission:{form_id}:{token}'
+
+
+def claim_token(form_id: int, token: str | None) -> bool:
+    """
+    Claim ``token`` for a submission to the form ``form_id``.
+
+    Returns ``False`` if the token has already been claimed, meaning the
+    request is a duplicate.  Missing or malformed tokens (for example from
+    a page rendered before tokens were introduced) are always accepted.
+    """
+    if not token or not _TOKEN_RE.match(token):
+        return True
+    return caches[CACHE_ALIAS].add(_key(form_id, token), 1)
+
+
+def release_token(form_id: int, token: str | None) -> None:
+    """Forget a claimed token so that the submission can be retried."""
+    if token and _TOKEN_RE.match(token):
+        caches[CACHE_ALIAS].delete(_key(form_id, token))
@@ -24,8 +24,14 @@ urlpatterns = [
     path('admin/', views.dashboard, name='dashboard'),
     path('admin/create/', views.create_form, name='create_form'),
     path('admin/form/<int:form_id>/responses/', views.view_responses, name='view_responses'),
+    path('admin/form/<int:form_id>/timeline/', views.form_timeline, name='form_timeline'),
     path('admin/form/<int:form_id>/export/csv/', views.export_responses_csv, name='export_csv'),
     path('admin/form/<int:form_id>/export/xlsx/', views.export_responses_xlsx, name='export_xlsx'),
+    path('admin/export/batch/', views.export_batch, name='export_batch'),
+    path('admin/metrics/', views.metrics_view, name='metrics'),
+    path('admin/profiles/', views.profile_list, name='profile_list'),
+    path('admin/profiles/<str:profile_id>/', views.profile_detail, name='profile_detail'),
+    path('admin/profiles/<str:profile_id>/download/', views.profile_download, name='profile_download'),
 
     # Form management actions
     path('admin/form/<int:form_id>/delete/', views.delete_form, name='delete_form'),
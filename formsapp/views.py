@@ -9,19 +9,36 @@ English with a footer credit to the University of Zanjan.
 """
 from __future__ import annotations
 
+import importlib.util
 import json
 import uuid
-import csv
 
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, Http404
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db import transaction
+from django.http import FileResponse, HttpRequest, HttpResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils import translation
+from django.utils import timezone, translation
 from django.utils.text import slugify
 
-from .models import Answer, Choice, Form, Question, Response
+from . import exports, metrics, profiling, rollups, submission_tokens
+from .admission import admission_control
+from .middleware import public_language
+from .models import Answer, Choice, Form, Question, Response, SubmissionRollup
+
+# Size of the daily submissions sparkline on the dashboard
+SPARKLINE_DAYS = 30
+SPARKLINE_WIDTH = 120
+SPARKLINE_HEIGHT = 24
+# Charts on the per-form timeline page
+TIMELINE_CHARTS = [
+    # (period, number of buckets, date format for bar labels, chart title)
+    (SubmissionRollup.DAY, 90, 'Y-m-d', 'پاسخ‌های روزانه (۹۰ روز اخیر)'),
+    (SubmissionRollup.HOUR, 48, 'Y-m-d H:00', 'پاسخ‌های ساعتی (۴۸ ساعت اخیر)'),
+]
+CHART_WIDTH = 900
+CHART_HEIGHT = 160
 
 
 def custom_login(request: HttpRequest) -> HttpResponse:
@@ -70,10 +87,24 @@ def dashboard(request: HttpRequest) -> HttpResponse:
     uses Persian throughout.
     """
     translation.activate('fa')
-    forms = Form.objects.all().order_by('-created_at')
+    forms = list(Form.objects.all().order_by('-created_at'))
+    # Daily submission counts for the last 30 days, drawn as a sparkline
+    daily = rollups.series([f.id for f in forms], SubmissionRollup.DAY, SPARKLINE_DAYS)
+    for form in forms:
+        form.sparkline = _sparkline_points([count for _, count in daily[form.id]])
     return render(request, 'admin/dashboard.html', {'forms': forms})
 
 
+def _sparkline_points(values: list[int]) -> str:
+    """Return SVG polyline points drawing ``values`` in the sparkline box."""
+    peak = max(values) or 1
+    step = SPARKLINE_WIDTH / max(len(values) - 1, 1)
+    return ' '.join(
+        f"{i * step:.1f},{SPARKLINE_HEIGHT - value / peak * SPARKLINE_HEIGHT:.1f}"
+        for i, value in enumerate(values)
+    )
+
+
 @login_required(login_url='formsapp:login')
 def create_form(request: HttpRequest) -> HttpResponse:
     """
@@ -178,6 +209,7 @@ def archive_form(request: HttpRequest, form_id: int) -> HttpResponse:
     return redirect('formsapp:dashboard')
 
 
+@admission_control
 def display_form(request: HttpRequest, slug: str) -> HttpResponse:
     """
     Display a published form for respondents and handle submissions.
@@ -185,41 +217,65 @@ def display_form(request: HttpRequest, slug: str) -> HttpResponse:
     The form page is presented in English.  When a respondent submits
     answers via POST the response and answers are saved to the database.
     After submission a thank you page is rendered.
+
+    Each rendered form carries a one-time submission token.  A repeated POST
+    with the same token (double click or browser retry) gets the thank you
+    page without saving the answers a second time.
     """
     # Activate English for the public interface
-    translation.activate('en')
+    translation.activate(public_language())
     form_obj = get_object_or_404(Form, slug=slug, published=True)
     if request.method == 'POST':
-        # Create a response entry
-        response_obj = Response.objects.create(form=form_obj)
-        for question in form_obj.questions.all():
-            field_name = f"question_{question.id}"
-            value = request.POST.get(field_name)
-            if question.question_type == Question.TEXT:
-                Answer.objects.create(
-                    response=response_obj,
-                    question=question,
-                    text=value or '',
-                )
-            else:
-                # Multiple choice: value is choice id
-                choice_obj = None
-                text_value = ''
-                if value:
-                    try:
-                        choice_obj = Choice.objects.get(id=int(value), question=question)
-                        text_value = choice_obj.text
-                    except (ValueError, Choice.DoesNotExist):
-                        text_value = value
-                Answer.objects.create(
-                    response=response_obj,
-                    question=question,
-                    choice=choice_obj,
-                    text=text_value,
-                )
+        token = request.POST.get(submission_tokens.FIELD_NAME)
+        if not submission_tokens.claim_token(form_obj.id, token):
+            metrics.increment('duplicate_submissions_suppressed')
+            return render(request, 'thanks.html', {'form': form_obj})
+        try:
+            with transaction.atomic():
+                _save_submission(request, form_obj)
+        except Exception:
+            # Let the respondent retry with the same token.
+            submission_tokens.release_token(form_obj.id, token)
+            raise
         return render(request, 'thanks.html', {'form': form_obj})
 
-    return render(request, 'form.html', {'form': form_obj})
+    return render(request, 'form.html', {
+        'form': form_obj,
+        'submission_token': submission_tokens.issue_token(),
+    })
+
+
+def _save_submission(request: HttpRequest, form_obj: Form) -> Response:
+    """Store the answers posted to ``form_obj`` as a new response."""
+    # Create a response entry
+    response_obj = Response.objects.create(form=form_obj)
+    rollups.record_submission(response_obj)
+    for question in form_obj.questions.all():
+        field_name = f"question_{question.id}"
+        value = request.POST.get(field_name)
+        if question.question_type == Question.TEXT:
+            Answer.objects.create(
+                response=response_obj,
+                question=question,
+                text=value or '',
+            )
+        else:
+            # Multiple choice: value is choice id
+            choice_obj = None
+            text_value = ''
+            if value:
+                try:
+                    choice_obj = Choice.objects.get(id=int(value), question=question)
+                    text_value = choice_obj.text
+                except (ValueError, Choice.DoesNotExist):
+                    text_value = value
+            Answer.objects.create(
+                response=response_obj,
+                question=question,
+                choice=choice_obj,
+                text=text_value,
+            )
+    return response_obj
 
 
 @login_required(login_url='formsapp:login')
@@ -260,6 +316,52 @@ def view_responses(request: HttpRequest, form_id: int) -> HttpResponse:
     })
 
 
+def _bar_chart(points: list[tuple[object, int]]) -> dict:
+    """Lay out ``(bucket_start, count)`` pairs as SVG bars."""
+    peak = max((count for _, count in points), default=0) or 1
+    slot = CHART_WIDTH / max(len(points), 1)
+    bars = []
+    for i, (start, count) in enumerate(points):
+        height = count / peak * CHART_HEIGHT
+        bars.append({
+            'x': f"{i * slot:.1f}",
+            'y': f"{CHART_HEIGHT - height:.1f}",
+            'width': f"{max(slot - 1, 1):.1f}",
+            'height': f"{height:.1f}",
+            'start': start,
+            'count': count,
+        })
+    return {'bars': bars, 'peak': peak, 'total': sum(count for _, count in points)}
+
+
+@login_required(login_url='formsapp:login')
+def form_timeline(request: HttpRequest, form_id: int) -> HttpResponse:
+    """
+    Chart the submissions a form received per day and per hour.
+
+    The charts are drawn from the submission rollups, so the page reads a
+    fixed number of rows however many responses the form has.
+    """
+    translation.activate('fa')
+    form_obj = get_object_or_404(Form, id=form_id)
+    if form_obj.archived:
+        messages.warning(
+            request,
+            'این فرم بایگانی شده است و پاسخ‌های آن قابل مشاهده نیستند.'
+        )
+        return redirect('formsapp:dashboard')
+    charts = []
+    for period, buckets, date_format, title in TIMELINE_CHARTS:
+        points = rollups.series([form_obj.id], period, buckets)[form_obj.id]
+        charts.append({'title': title, 'date_format': date_format, **_bar_chart(points)})
+    return render(request, 'admin/timeline.html', {
+        'form': form_obj,
+        'charts': charts,
+        'chart_width': CHART_WIDTH,
+        'chart_height': CHART_HEIGHT,
+    })
+
+
 @login_required(login_url='formsapp:login')
 def export_responses_csv(request: HttpRequest, form_id: int) -> HttpResponse:
     """
@@ -274,25 +376,11 @@ def export_responses_csv(request: HttpRequest, form_id: int) -> HttpResponse:
     if form_obj.archived:
         messages.warning(request, 'خروجی گرفتن از فرم بایگانی شده امکان‌پذیر نیست.')
         return redirect('formsapp:view_responses', form_id=form_id)
-    questions = list(form_obj.questions.all())
-    responses = form_obj.responses.all().order_by('submitted_at')
     # Create the CSV file in memory
-    response = HttpResponse(content_type='text/csv')
+    response = HttpResponse(content_type=exports.CONTENT_TYPES[exports.CSV])
     filename = slugify(form_obj.title) or 'form'
     response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-    writer = csv.writer(response)
-    # Header row
-    header = ['Submitted At'] + [q.text for q in questions]
-    writer.writerow(header)
-    for resp in responses:
-        row = [resp.submitted_at.isoformat()]
-        for q in questions:
-            ans = resp.answers.filter(question=q).first()
-            if ans:
-                row.append(ans.choice.text if ans.choice else ans.text)
-            else:
-                row.append('')
-        writer.writerow(row)
+    exports.write_csv(form_obj, response)
     return response
 
 
@@ -309,31 +397,103 @@ def export_responses_xlsx(request: HttpRequest, form_id: int) -> HttpResponse:
     if form_obj.archived:
         messages.warning(request, 'خروجی گرفتن از فرم بایگانی شده امکان‌پذیر نیست.')
         return redirect('formsapp:view_responses', form_id=form_id)
-    questions = list(form_obj.questions.all())
-    responses_qs = form_obj.responses.all().order_by('submitted_at')
     try:
-        from openpyxl import Workbook  # type: ignore
+        wb = exports.build_workbook(form_obj)
     except ImportError:
         messages.error(request, 'کتابخانه openpyxl نصب نشده است. لطفاً قبل از استفاده، آن را نصب کنید.')
         return redirect('formsapp:view_responses', form_id=form_id)
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Responses'
-    # Header row
-    ws.append(['Submitted At'] + [q.text for q in questions])
-    for resp in responses_qs:
-        row = [resp.submitted_at.isoformat()]
-        for q in questions:
-            ans = resp.answers.filter(question=q).first()
-            if ans:
-                row.append(ans.choice.text if ans.choice else ans.text)
-            else:
-                row.append('')
-        ws.append(row)
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    response = HttpResponse(content_type=exports.CONTENT_TYPES[exports.XLSX])
     filename = slugify(form_obj.title) or 'form'
     response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
     wb.save(response)
-    return response
\ No newline at end of file
+    return response
+
+
+@login_required(login_url='formsapp:login')
+def export_batch(request: HttpRequest) -> HttpResponse:
+    """
+    Export several forms at once as a single ZIP archive.
+
+    The dashboard posts the ids of the selected forms and the wanted
+    formats.  Each form is exported in its own worker process and the
+    archive is streamed to the browser as the files are completed.
+    Archived forms are skipped.  Only one batch export runs at a time; a
+    second request is sent back to the dashboard with an error message.
+    """
+    if request.method != 'POST':
+        return redirect('formsapp:dashboard')
+    ids = [int(value) for value in request.POST.getlist('form_ids') if value.isdigit()]
+    formats = [fmt for fmt in request.POST.getlist('formats') if fmt in exports.FORMATS]
+    form_ids = list(
+        Form.objects.filter(id__in=ids, archived=False).order_by('id').values_list('id', flat=True)
+    )
+    if not form_ids or not formats:
+        messages.error(request, 'حداقل یک فرم فعال و یک قالب خروجی را انتخاب کنید.')
+        return redirect('formsapp:dashboard')
+    if exports.XLSX in formats and importlib.util.find_spec('openpyxl') is None:
+        messages.error(request, 'کتابخانه openpyxl نصب نشده است. لطفاً قبل از استفاده، آن را نصب کنید.')
+        return redirect('formsapp:dashboard')
+    try:
+        chunks = exports.iter_zip(form_ids, formats)
+    except exports.ExportBusy:
+        messages.error(request, 'خروجی گروهی دیگری در حال ساخت است. لطفاً چند لحظه بعد دوباره تلاش کنید.')
+        return redirect('formsapp:dashboard')
+    response = StreamingHttpResponse(chunks, content_type='application/zip')
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="forms-export-{stamp}.zip"'
+    return response
+
+
+@login_required(login_url='formsapp:login')
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Return the in-process operational counters as JSON.
+
+    Counters are kept per worker process and start from zero whenever the
+    process restarts.
+    """
+    return JsonResponse(metrics.snapshot())
+
+
+def _is_staff(user) -> bool:
+    return user.is_active and user.is_staff
+
+
+@login_required(login_url='formsapp:login')
+@user_passes_test(_is_staff, login_url='formsapp:login')
+def profile_list(request: HttpRequest) -> HttpResponse:
+    """
+    List the most recent request profiles recorded by ``ProfilingMiddleware``.
+
+    Profiles are captured when a staff member adds ``?_profile=1`` to a URL
+    (or sends ``X-Profile: 1``) and for a sampled fraction of requests.
+    """
+    translation.activate('fa')
+    return render(request, 'admin/profiles.html', {
+        'profiles': profiling.recent_profiles(),
+    })
+
+
+@login_required(login_url='formsapp:login')
+@user_passes_test(_is_staff, login_url='formsapp:login')
+def profile_detail(request: HttpRequest, profile_id: str) -> HttpResponse:
+    """Show the hottest functions and the SQL breakdown of one profile."""
+    translation.activate('fa')
+    loaded = profiling.load_profile(profile_id)
+    if loaded is None:
+        raise Http404('Profile not found')
+    meta, report = loaded
+    return render(request, 'admin/profile_detail.html', {
+        'profile': meta,
+        'report': report,
+    })
+
+
+@login_required(login_url='formsapp:login')
+@user_passes_test(_is_staff, login_url='formsapp:login')
+def profile_download(request: HttpRequest, profile_id: str) -> HttpResponse:
+    """Download the raw ``.prof`` file of a profile for use with pstats."""
+    if profiling.load_profile(profile_id, limit=0) is None:
+        raise Http404('Profile not found')
+    path = profiling.profile_dir() / f'{profile_id}.prof'
+    return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
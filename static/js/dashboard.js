@@ -0,0 +1,40 @@
+/*
+ * Dashboard helpers: copying share links and filtering forms by title.
+ */
+
+function copyLink(id) {
+    const input = document.getElementById(id);
+    input.select();
+    input.setSelectionRange(0, 99999);
+    navigator.clipboard.writeText(input.value);
+    alert('لینک کپی شد.');
+}
+// Simple client-side search to filter forms by title
+const searchInput = document.getElementById('search-input');
+if (searchInput) {
+    searchInput.addEventListener('input', function() {
+        const filter = this.value.toLowerCase();
+        const rows = document.querySelectorAll('#forms-table tbody tr');
+        rows.forEach(row => {
+            const title = row.getAttribute('data-title');
+            if (!filter || (title && title.indexOf(filter) > -1)) {
+                row.style.display = '';
+            } else {
+                row.style.display = 'none';
+            }
+        });
+    });
+}
+
+// Select or clear every visible, exportable form for the batch export
+const selectAll = document.getElementById('select-all-forms');
+if (selectAll) {
+    selectAll.addEventListener('change', function() {
+        document.querySelectorAll('#forms-table tbody tr').forEach(row => {
+            const box = row.querySelector('.form-select');
+            if (box && !box.disabled && row.style.display !== 'none') {
+                box.checked = selectAll.checked;
+            }
+        });
+    });
+}
@@ -24,7 +24,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-please-change-this-secret-key-to-your-own'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Set ``DJANGO_DEBUG=0`` in the environment to run in production mode, which
+# also switches static files to hashed, precompressed assets (see below).
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') != '0'
 
 # Allow all hosts for development.  In production you should specify your domain.
 ALLOWED_HOSTS = ["127.0.0.1", "localhost", "192.168.202.49","qs.znu.ac.ir"]
@@ -44,12 +46,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.locale.LocaleMiddleware',
+    # LocaleMiddleware that skips language negotiation on public form pages
+    'formsapp.middleware.PublicLocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Must come after AuthenticationMiddleware: staff-triggered profiles check request.user.
+    'formsapp.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'university_forms.urls'
@@ -58,8 +63,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'formsapp' / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory so each request only pays
+            # for rendering, not for reading and parsing the template files.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -83,6 +95,73 @@ DATABASES = {
     }
 }
 
+# Caches
+# ``submissions`` remembers the one-time tokens embedded in public forms so
+# that repeated POSTs of the same form are not stored twice (see
+# ``formsapp/submission_tokens.py``).  Tokens expire after ``TIMEOUT``
+# seconds and the least recently used ones are evicted beyond
+# ``MAX_ENTRIES``.  The in-memory backend is per process; use a shared cache
+# such as Redis or Memcached when running several worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'submissions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'submission-tokens',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# Public form pages are always rendered in ``FORMS_PUBLIC_LANGUAGE``.  Under
+# ``FORMS_PUBLIC_PATH_PREFIXES`` the language is activated without
+# negotiation; see ``formsapp/middleware.py``.
+
+FORMS_PUBLIC_PATH_PREFIXES = ('/form/',)
+FORMS_PUBLIC_LANGUAGE = 'en'
+
+# Admission control for public form submissions (see ``formsapp/admission.py``).
+# Each client IP may submit a given form ``FORMS_RATE_LIMIT_BURST`` times in a
+# row and then ``FORMS_RATE_LIMIT_RATE`` times per second.  At most
+# ``FORMS_MAX_CONCURRENT_WRITES`` submissions are saved at once per process;
+# others wait up to ``FORMS_WRITE_SLOT_TIMEOUT`` seconds before receiving a 503.
+# Set the rate or the write limit to ``None`` to disable that check.
+
+FORMS_RATE_LIMIT_RATE = 5
+FORMS_RATE_LIMIT_BURST = 300
+FORMS_RATE_LIMIT_MAX_KEYS = 10_000
+FORMS_MAX_CONCURRENT_WRITES = 4
+FORMS_WRITE_SLOT_TIMEOUT = 0.5
+# Number of reverse proxies (e.g. nginx) in front of the site that append the
+# peer address to X-Forwarded-For.  The client address is taken from that
+# many entries from the right; 0 uses REMOTE_ADDR.
+FORMS_TRUSTED_PROXY_COUNT = int(os.environ.get('DJANGO_TRUSTED_PROXY_COUNT', '0'))
+
+# Batch exports (see ``formsapp/exports.py``).  One batch export runs at a
+# time per process, spread over at most ``FORMS_EXPORT_MAX_WORKERS`` spawned
+# worker processes; 1 builds the files in the serving process.  Workers are
+# started with ``FORMS_EXPORT_PYTHON`` (``None`` means ``sys.executable``),
+# which must be a Python interpreter; under uWSGI or mod_wsgi set it to the
+# virtualenv's ``bin/python``.
+
+FORMS_EXPORT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+FORMS_EXPORT_PYTHON = os.environ.get('DJANGO_EXPORT_PYTHON') or None
+
+# Request profiling (see ``formsapp/profiling.py``).  Staff can profile a
+# request to ``formsapp.views`` by adding ``?_profile=1`` or sending the
+# ``X-Profile: 1`` header; in addition ``FORMS_PROFILE_SAMPLE_RATE`` of all
+# requests (0.0-1.0) are profiled.  The newest ``FORMS_PROFILE_KEEP``
+# profiles are kept in ``FORMS_PROFILE_DIR`` and listed at /admin/profiles/.
+
+FORMS_PROFILE_DIR = BASE_DIR / 'profiles'
+FORMS_PROFILE_SAMPLE_RATE = 0.0
+FORMS_PROFILE_KEEP = 100
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 
@@ -124,7 +203,24 @@ LOCALE_PATHS = [BASE_DIR / 'locale']
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/stable/howto/static-files/
 STATIC_URL = "/static/"
-STATIC_ROOT = "/var/www/formmaker/static"
+STATIC_ROOT = os.environ.get("DJANGO_STATIC_ROOT", "/var/www/formmaker/static")
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# In production ``collectstatic`` writes content-hashed copies of every asset
+# plus gzip/brotli variants so the web server can cache them far into the
+# future and serve them precompressed.  During development the plain storage
+# is used so that no ``collectstatic`` run is required.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "formsapp.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'